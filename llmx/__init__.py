@@ -4,9 +4,33 @@ LLM CLI wrapper providing enhanced functionality over simonw/llm.
 
 __version__ = "0.1.0"
 
-from llmx.cli import app, run
+# Public names are resolved on first access (PEP 562) so that importing the
+# package doesn't pull in llm, rich and the command modules.
+_LAZY = {
+    "app": ("llmx.cli", "app"),
+    "run": ("llmx.cli", "run"),
+    "pyclaude": ("llmx.commands", "pyclaude"),
+    "simplify": ("llmx.commands", "simplify"),
+    "zshclaude": ("llmx.commands", "zshclaude"),
+    "zshcmd": ("llmx.commands", "zshcmd"),
+    "TemplateManager": ("llmx.templates", "TemplateManager"),
+    "format_piped_content": ("llmx.utils", "format_piped_content"),
+    "get_piped_content": ("llmx.utils", "get_piped_content"),
+}
 
-# Import commands for easier access
-from llmx.commands import pyclaude, simplify, zshclaude, zshcmd
-from llmx.templates import TemplateManager
-from llmx.utils import format_piped_content, get_piped_content
+__all__ = ["__version__", *_LAZY]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        module_name, attr = _LAZY[name]
+        value = getattr(importlib.import_module(module_name), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY])
@@ -3,25 +3,30 @@ Main CLI entry point for the LLM wrapper.
 """
 
 import os
-import subprocess
 import sys
-import tempfile
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
 
 import typer
-from rich.console import Console
-from rich.markdown import Markdown
 
-import llm
-from llmx.templates import TemplateManager
+from llmx.commands import app as commands_app
+from llmx.utils import (
+    format_piped_content,
+    get_async_model,
+    get_console,
+    get_model,
+    get_piped_content,
+    iter_piped_content,
+    render_response,
+    run_command,
+)
 
 # Create Typer app
 app = typer.Typer(
     help="Enhanced wrapper for simonw/llm with sane defaults, better content handling, and rich output"
 )
 
-console = Console()
-
 # Default values
 DEFAULT_TEMPERATURE = 0
 DEFAULT_MODEL = "gpt-4o-mini"
@@ -35,14 +40,49 @@ USER_PATH = os.environ.get("LLM_USER_PATH") or os.path.join(
 )
 
 # Subcommands that support various options
-SUBCOMMANDS_SUPPORTING_SYSTEM_OPTION = ["prompt", "chat"]
-SUBCOMMANDS_SUPPORTING_TEMPLATE_OPTION = ["prompt", "chat"]
-SUBCOMMANDS_SUPPORTING_TEMPERATURE = ["prompt", "chat"]
-SUBCOMMANDS_SUPPORTING_MODEL_OPTION = ["prompt", "chat"]
+SUBCOMMANDS_SUPPORTING_SYSTEM_OPTION = frozenset({"prompt", "chat"})
+SUBCOMMANDS_SUPPORTING_TEMPLATE_OPTION = frozenset({"prompt", "chat"})
+SUBCOMMANDS_SUPPORTING_TEMPERATURE = frozenset({"prompt", "chat"})
+SUBCOMMANDS_SUPPORTING_MODEL_OPTION = frozenset({"prompt", "chat"})
 
 
-from llmx.commands import app as commands_app
-from llmx.utils import format_piped_content, get_piped_content
+@dataclass(slots=True)
+class CtxObj:
+    """
+    Global options shared with subcommands through the Typer context.
+    """
+
+    temperature: Optional[float] = None
+    template: Optional[str] = None
+    model: Optional[str] = None
+    system: Optional[str] = None
+    format_stdin: bool = True
+    md: bool = True
+    inline_code_lexer: str = "python"
+    stdin_tag: Optional[str] = None
+
+
+@dataclass(slots=True)
+class LLMParams:
+    """
+    Parameters for a single llm API call.
+    """
+
+    prompt: str
+    model_name: str = DEFAULT_MODEL
+    system: Optional[str] = None
+    temperature: Optional[float] = None
+
+    def prompt_kwargs(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for Model.prompt(), omitting unset options.
+        """
+        kwargs = {"prompt": self.prompt}
+        if self.system is not None:
+            kwargs["system"] = self.system
+        if self.temperature is not None:
+            kwargs["temperature"] = self.temperature
+        return kwargs
 
 
 @app.callback(invoke_without_command=True)
@@ -74,142 +114,188 @@ def main(
     """
     Enhanced wrapper for simonw/llm with sane defaults, better content handling, and rich output.
     """
-    # Set up context object if not already done
-    if ctx.obj is None:
-        ctx.obj = {}
-
     # Store options in context
-    ctx.obj.update(
-        {
-            "temperature": temperature,
-            "template": template,
-            "model": model,
-            "system": system,
-            "format_stdin": format_stdin,
-            "md": md,
-            "inline_code_lexer": inline_code_lexer,
-            "stdin_tag": stdin_tag,
-        }
+    ctx.obj = CtxObj(
+        temperature=temperature,
+        template=template,
+        model=model,
+        system=system,
+        format_stdin=format_stdin,
+        md=md,
+        inline_code_lexer=inline_code_lexer,
+        stdin_tag=stdin_tag,
     )
 
-    # Skip if --help was passed
-    if ctx.invoked_subcommand is None and not sys.argv[1:]:
-        ctx.invoke(prompt, ctx=ctx)
-        return
+    # Without a subcommand, run prompt directly rather than re-dispatching
+    if ctx.invoked_subcommand is None:
+        ctx.invoke(prompt, ctx=ctx, prompt_text=[], parallel=1)
 
 
 def build_llm_params(
     subcommand: str,
-    ctx_obj: Dict[str, Any],
+    ctx_obj: CtxObj,
     args: List[str],
     piped_content: Optional[str] = None,
-) -> Dict[str, Any]:
+) -> LLMParams:
     """
     Build parameters for llm API calls.
     """
-    template_mgr = TemplateManager()
-    params = {}
+    from llmx.templates import template_content, template_names
 
     # Handle prompt content
-    if args and isinstance(args, list):
-        prompt_content = " ".join(args) if args else ""
-    else:
-        prompt_content = ""
+    prompt_content = " ".join(args) if args else ""
     if piped_content:
         # If we have piped content and prompt content, use the prompt content normally
         # and add the piped content to the prompt
-        if prompt_content:
-            prompt_content = f"{prompt_content}\n\n{piped_content}"
-        else:
-            prompt_content = piped_content
+        prompt_content = (
+            f"{prompt_content}\n\n{piped_content}" if prompt_content else piped_content
+        )
 
-    params["prompt"] = prompt_content
+    params = LLMParams(prompt=prompt_content)
 
     # Handle system prompt
-    if (
-        subcommand in SUBCOMMANDS_SUPPORTING_SYSTEM_OPTION
-        and ctx_obj
-        and ctx_obj.get("system")
-    ):
+    if subcommand in SUBCOMMANDS_SUPPORTING_SYSTEM_OPTION and ctx_obj.system:
         # If it's a template reference, resolve it
-        if ctx_obj["system"] in template_mgr.list_templates():
-            system_prompt = template_mgr.get_template_content(ctx_obj["system"])
+        if ctx_obj.system in template_names():
+            params.system = template_content(ctx_obj.system)
         else:
-            system_prompt = ctx_obj["system"]
-        params["system"] = system_prompt
+            params.system = ctx_obj.system
 
     # Handle temperature
-    if (
-        subcommand in SUBCOMMANDS_SUPPORTING_TEMPERATURE
-        and ctx_obj
-        and ctx_obj.get("temperature") is not None
-    ):
-        params["temperature"] = ctx_obj["temperature"]
-    elif subcommand in SUBCOMMANDS_SUPPORTING_TEMPERATURE:
-        params["temperature"] = DEFAULT_TEMPERATURE
-
-    # Handle model name (returned separately)
-    model_name = DEFAULT_MODEL
-    if (
-        subcommand in SUBCOMMANDS_SUPPORTING_MODEL_OPTION
-        and ctx_obj
-        and ctx_obj.get("model")
-    ):
-        model_name = ctx_obj["model"]
-
-    return params, model_name
+    if subcommand in SUBCOMMANDS_SUPPORTING_TEMPERATURE:
+        if ctx_obj.temperature is not None:
+            params.temperature = ctx_obj.temperature
+        else:
+            params.temperature = DEFAULT_TEMPERATURE
+
+    # Handle model name
+    if subcommand in SUBCOMMANDS_SUPPORTING_MODEL_OPTION and ctx_obj.model:
+        params.model_name = ctx_obj.model
+
+    return params
+
+
+def prompt_many(
+    ctx_obj: CtxObj,
+    args: List[str],
+    inputs: Iterable[str],
+    parallel: int,
+) -> int:
+    """
+    Send one prompt per input concurrently and display the responses in input order.
+    Inputs are consumed as they arrive, with at most `parallel` requests in flight.
+    Returns the number of prompts sent.
+    """
+    import asyncio
+    from collections import deque
+
+    inputs = iter(inputs)
+
+    def display(result: str):
+        render_response(
+            [result],
+            md=ctx_obj.md,
+            inline_code_lexer=ctx_obj.inline_code_lexer,
+        )
+        if not ctx_obj.md:
+            sys.stdout.write("\n")
+
+    async def run_all() -> int:
+        semaphore = asyncio.Semaphore(parallel)
+
+        async def run_one(piped_content):
+            params = build_llm_params("prompt", ctx_obj, args, piped_content)
+            model = get_async_model(params.model_name)
+            async with semaphore:
+                return await model.prompt(**params.prompt_kwargs()).text()
+
+        # Responses are displayed in input order, so keep a bounded window of
+        # pending tasks and stop reading input while its head is outstanding
+        pending = deque()
+        count = 0
+        try:
+            while True:
+                # Inputs may block (e.g. stdin), so advance them off the event loop
+                piped_content = await asyncio.to_thread(next, inputs, None)
+                if piped_content is None:
+                    break
+                pending.append(asyncio.create_task(run_one(piped_content)))
+                count += 1
+                while pending and (pending[0].done() or len(pending) >= 2 * parallel):
+                    display(await pending.popleft())
+
+            while pending:
+                display(await pending.popleft())
+        finally:
+            # A failed prompt stops the run; cancel the other requests and
+            # retrieve their results, so none is left running or unawaited
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return count
+
+    return asyncio.run(run_all())
 
 
 @app.command()
 def prompt(
     ctx: typer.Context,
     prompt_text: List[str] = typer.Argument(None, help="Prompt text"),
+    parallel: int = typer.Option(
+        1,
+        "-P",
+        "--parallel",
+        help="Send each line of piped content as its own prompt, N at a time",
+    ),
 ):
     """
     Send a prompt to the LLM and display the response.
     """
+    console = get_console()
+
+    # Send each piped line as its own prompt, as soon as it arrives
+    if parallel > 1:
+        lines = (line.rstrip("\n") for line in iter_piped_content() if line.strip())
+        if ctx.obj.format_stdin:
+            lines = (
+                format_piped_content(line, stdin_tag=ctx.obj.stdin_tag)
+                for line in lines
+            )
+        try:
+            if prompt_many(ctx.obj, prompt_text, lines, parallel):
+                return
+        except Exception as e:
+            console.print(f"[bold red]Error:[/bold red] {str(e)}")
+            sys.exit(1)
+
     # Get piped content and format it if needed
     raw_piped_content = get_piped_content()
     piped_content = None
 
-    if raw_piped_content and ctx.obj.get("format_stdin", True):
+    if raw_piped_content and ctx.obj.format_stdin:
         piped_content = format_piped_content(
-            raw_piped_content, stdin_tag=ctx.obj.get("stdin_tag")
+            raw_piped_content, stdin_tag=ctx.obj.stdin_tag
         )
     elif raw_piped_content:
         piped_content = raw_piped_content
 
-    # Create temporary file for output
-    with tempfile.NamedTemporaryFile(mode="w+", delete=False) as tmp:
-        # Build llm params and call API
-        params, model_name = build_llm_params(
-            "prompt", ctx.obj, prompt_text, piped_content
-        )
+    # Build llm params and call API
+    params = build_llm_params("prompt", ctx.obj, prompt_text, piped_content)
 
-        # Use the llm API
-        try:
-            model = llm.get_model(model_name)
-            response = model.prompt(**params)
-            result = response.text()
-            tmp.write(result)
-            tmp.close()
-
-            # Handle markdown display
-            if ctx.obj.get("md", True):
-                md = Markdown(result, code_theme="monokai")
-                console.print(md)
-            else:
-                with open(tmp.name, "r") as f:
-                    sys.stdout.write(f.read())
-        except Exception as e:
-            console.print(f"[bold red]Error:[/bold red] {str(e)}")
-            sys.exit(1)
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(tmp.name)
-            except:
-                pass
+    # Use the llm API
+    try:
+        model = get_model(params.model_name)
+        response = model.prompt(**params.prompt_kwargs())
+
+        # Display the response as it streams in
+        render_response(
+            response,
+            md=ctx.obj.md,
+            inline_code_lexer=ctx.obj.inline_code_lexer,
+        )
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        sys.exit(1)
 
 
 @app.command()
@@ -220,44 +306,45 @@ def chat(
     """
     Start an interactive chat with the selected model.
     """
+    console = get_console()
+
     # Get piped content and format it if needed
     raw_piped_content = get_piped_content()
     piped_content = None
 
-    if raw_piped_content and ctx.obj.get("format_stdin", True):
+    if raw_piped_content and ctx.obj.format_stdin:
         piped_content = format_piped_content(
-            raw_piped_content, stdin_tag=ctx.obj.get("stdin_tag")
+            raw_piped_content, stdin_tag=ctx.obj.stdin_tag
         )
     elif raw_piped_content:
         piped_content = raw_piped_content
 
     # Build llm params and prepare for chat
-    params, model_name = build_llm_params("chat", ctx.obj, message, piped_content)
+    params = build_llm_params("chat", ctx.obj, message, piped_content)
+
+    # Enable line editing and history for input()
+    try:
+        import readline  # noqa: F401
+    except ImportError:
+        pass
 
     # If there's an initial message, send it first
     try:
-        model = llm.get_model(model_name)
+        model = get_model(params.model_name)
 
-        # Create a conversation
-        conversation = None
-        if params.get("prompt"):
+        # Create a conversation; llm keeps the history and sends it with each turn
+        conversation = model.conversation()
+        prompt_kwargs = {"system": params.system, "temperature": params.temperature}
+        if params.prompt:
             # Send the initial message
-            response = model.prompt(
-                params["prompt"],
-                system=params.get("system"),
-                temperature=params.get("temperature", DEFAULT_TEMPERATURE),
-            )
-            result = response.text()
-
-            # Display response
-            if ctx.obj.get("md", True):
-                md = Markdown(result, code_theme="monokai")
-                console.print(md)
-            else:
-                sys.stdout.write(result)
+            response = conversation.prompt(params.prompt, **prompt_kwargs)
 
-            # Get the conversation ID for continuation
-            conversation = response.response.conversation
+            # Display response as it streams in
+            render_response(
+                response,
+                md=ctx.obj.md,
+                inline_code_lexer=ctx.obj.inline_code_lexer,
+            )
 
         # Run the interactive chat
         console.print(
@@ -272,23 +359,14 @@ def chat(
                 break
 
             # Call the API with input
-            response = model.prompt(
-                user_input,
-                system=params.get("system"),
-                temperature=params.get("temperature", DEFAULT_TEMPERATURE),
-                conversation=conversation,
-            )
-            result = response.text()
+            response = conversation.prompt(user_input, **prompt_kwargs)
 
-            # Update conversation ID for continuation
-            conversation = response.response.conversation
-
-            # Display response
-            if ctx.obj.get("md", True):
-                md = Markdown(result, code_theme="monokai")
-                console.print(md)
-            else:
-                sys.stdout.write(result)
+            # Display response as it streams in
+            render_response(
+                response,
+                md=ctx.obj.md,
+                inline_code_lexer=ctx.obj.inline_code_lexer,
+            )
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         sys.exit(1)
@@ -298,42 +376,48 @@ def chat(
 def cmd(
     ctx: typer.Context,
     command: List[str] = typer.Argument(None, help="Command to execute"),
+    parallel: int = typer.Option(
+        1,
+        "-P",
+        "--parallel",
+        help="Send each line of the command output as its own prompt, N at a time",
+    ),
 ):
     """
     Execute a command and pass the output to the LLM for analysis.
     """
+    console = get_console()
+
     if not command:
         console.print("[bold red]Error:[/bold red] No command provided")
         sys.exit(1)
 
     # Execute the command and get the output
     try:
-        result = subprocess.run(
-            " ".join(command), shell=True, capture_output=True, text=True
-        )
+        result = run_command(command)
 
         if result.returncode != 0:
             console.print(f"[bold red]Command error:[/bold red] {result.stderr}")
             sys.exit(result.returncode)
 
-        # Build the LLM params and get the model name
-        params, model_name = build_llm_params("prompt", ctx.obj, [], result.stdout)
+        if parallel > 1:
+            lines = [line for line in result.stdout.splitlines() if line.strip()]
+            prompt_many(ctx.obj, [], lines, parallel)
+            return
+
+        # Build the LLM params
+        params = build_llm_params("prompt", ctx.obj, [], result.stdout)
 
         # Call the LLM API
-        model = llm.get_model(model_name)
-        response = model.prompt(
-            params["prompt"],
-            system=params.get("system"),
-            temperature=params.get("temperature", DEFAULT_TEMPERATURE),
+        model = get_model(params.model_name)
+        response = model.prompt(**params.prompt_kwargs())
+
+        # Display the result as it streams in
+        render_response(
+            response,
+            md=ctx.obj.md,
+            inline_code_lexer=ctx.obj.inline_code_lexer,
         )
-        llm_result = response.text()
-
-        # Display the result
-        if ctx.obj.get("md", True):
-            md = Markdown(llm_result, code_theme="monokai")
-            console.print(md)
-        else:
-            sys.stdout.write(llm_result)
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         sys.exit(1)
@@ -344,8 +428,10 @@ def templates():
     """
     List available templates.
     """
-    template_mgr = TemplateManager()
-    templates = template_mgr.list_templates()
+    from llmx.templates import template_names
+
+    console = get_console()
+    templates = template_names()
 
     if not templates:
         console.print("No templates found.")
@@ -356,7 +442,25 @@ def templates():
         console.print(f"  - {template}")
 
 
-# Add subcommands
+@app.command()
+def daemon(
+    socket_path: Optional[Path] = typer.Option(
+        None, "--socket", help="Unix socket to listen on [default: ~/.cache/llmx/sock]"
+    ),
+):
+    """
+    Serve CLI invocations over a Unix socket from a warm process.
+    """
+    from llmx.daemon import DEFAULT_SOCKET_PATH, serve
+
+    try:
+        serve(socket_path or DEFAULT_SOCKET_PATH)
+    except KeyboardInterrupt:
+        pass
+
+
+# Add subcommands; "llm cmd ..." has always reached these helpers, so the
+# group keeps that name even though it shadows the cmd command above
 app.add_typer(commands_app, name="cmd")
 
 
@@ -0,0 +1,55 @@
+"""
+Reuse of HTTP clients across llm calls.
+
+llm's OpenAI models build a new openai client, and with it a new connection
+pool, on every prompt. Handing back one client per model, API key and event
+loop lets consecutive prompts in the same process (chat turns, --parallel
+batches, daemon requests) reuse open connections instead of repeating the TCP
+and TLS handshakes.
+"""
+
+import asyncio
+import weakref
+from functools import lru_cache, wraps
+
+
+@lru_cache(maxsize=1)
+def install_client_reuse():
+    """
+    Patch llm's OpenAI models to reuse their API clients.
+    Safe to call repeatedly; does nothing if the plugin layout is unexpected.
+    """
+    try:
+        from llm.default_plugins import openai_models
+    except ImportError:
+        return
+
+    shared = getattr(openai_models, "_Shared", None)
+    if shared is not None and "get_client" in vars(shared):
+        shared.get_client = _reuse_clients(shared.get_client)
+
+
+def _reuse_clients(get_client):
+    clients = weakref.WeakKeyDictionary()
+
+    @wraps(get_client)
+    def wrapper(self, key, *, async_=False):
+        loop = None
+        if async_:
+            # Async clients are tied to the event loop they were first used on
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return get_client(self, key, async_=async_)
+
+        model_clients = clients.setdefault(self, {})
+        for cache_key in list(model_clients):
+            if cache_key[2] is not None and cache_key[2].is_closed():
+                del model_clients[cache_key]
+
+        cache_key = (key, async_, loop)
+        if cache_key not in model_clients:
+            model_clients[cache_key] = get_client(self, key, async_=async_)
+        return model_clients[cache_key]
+
+    return wrapper
@@ -2,53 +2,78 @@
 Convenience commands for specific templates and models.
 """
 
+import asyncio
 import sys
 from typing import List, Optional
 
-import llm
 import typer
-from rich.console import Console
-from rich.markdown import Markdown
 
-from llmx.templates import TemplateManager
+from llmx.utils import get_console, get_model, render_response, run_command
 
 app = typer.Typer(help="Additional helper commands for specific templates and models")
-console = Console()
-template_mgr = TemplateManager()
 
+DEFAULT_MODEL = "anthropic/claude-3-sonnet-20240229"
 
-@app.command()
-def simplify(
+
+def _run_template(
     ctx: typer.Context,
-    text: List[str] = typer.Argument(None, help="Text to simplify"),
+    template_names: List[str],
+    text: str,
+    model_name: str = DEFAULT_MODEL,
 ):
     """
-    Simplify the given text using the simplify template.
+    Prompt the model with the given templates merged into the system prompt.
     """
-    # Get templates and merge them
-    claude_template = template_mgr.get_template_content("claude")
-    simplify_template = template_mgr.get_template_content("simplify")
-    merged_content = f"{claude_template}\n\n{simplify_template}"
+    from llmx.cli import CtxObj
+    from llmx.templates import get_template_manager
 
-    # Run the prompt using llm
+    ctx_obj = ctx.obj or CtxObj()
     try:
-        model = llm.get_model("anthropic/claude-3-sonnet-20240229")
-        response = model.prompt(
-            " ".join(text) if text else "", system=merged_content, temperature=0
+        system_prompt = get_template_manager().merge_templates(*template_names)
+        response = get_model(model_name).prompt(
+            text, system=system_prompt, temperature=0
+        )
+        render_response(
+            response,
+            md=ctx_obj.md,
+            inline_code_lexer=ctx_obj.inline_code_lexer,
         )
-        result = response.text()
-
-        # Display the result
-        if ctx.obj and ctx.obj.get("md", True):
-            md = Markdown(result, code_theme="monokai")
-            console.print(md)
-        else:
-            sys.stdout.write(result)
     except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+        get_console().print(f"[bold red]Error:[/bold red] {str(e)}")
         sys.exit(1)
 
 
+async def _run_command_with_warmup(
+    command: List[str], template_names: List[str], model_name: str
+):
+    """
+    Run a shell command while the model and templates it will be sent to are
+    resolved in the background.
+    """
+    from llmx.templates import template_content
+
+    # Failures are ignored here; _run_template hits and reports them again
+    warmup = asyncio.gather(
+        asyncio.to_thread(get_model, model_name),
+        *(asyncio.to_thread(template_content, name) for name in template_names),
+        return_exceptions=True,
+    )
+    result = await asyncio.to_thread(run_command, command)
+    await warmup
+    return result
+
+
+@app.command()
+def simplify(
+    ctx: typer.Context,
+    text: List[str] = typer.Argument(None, help="Text to simplify"),
+):
+    """
+    Simplify the given text using the simplify template.
+    """
+    _run_template(ctx, ["claude", "simplify"], " ".join(text) if text else "")
+
+
 @app.command()
 def zshclaude(
     ctx: typer.Context,
@@ -57,26 +82,7 @@ def zshclaude(
     """
     Run a prompt using the zshclaude template.
     """
-    # Get the zshclaude template
-    system_prompt = template_mgr.get_template_content("zshclaude")
-
-    # Run the prompt using llm
-    try:
-        model = llm.get_model("anthropic/claude-3-sonnet-20240229")
-        response = model.prompt(
-            " ".join(prompt) if prompt else "", system=system_prompt, temperature=0
-        )
-        result = response.text()
-
-        # Display the result
-        if ctx.obj and ctx.obj.get("md", True):
-            md = Markdown(result, code_theme="monokai")
-            console.print(md)
-        else:
-            sys.stdout.write(result)
-    except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
-        sys.exit(1)
+    _run_template(ctx, ["zshclaude"], " ".join(prompt) if prompt else "")
 
 
 @app.command()
@@ -88,38 +94,16 @@ def zshcmd(
     """
     Run a command using the zshcmd template.
     """
-    # Get the zshcmd template
-    system_prompt = template_mgr.get_template_content("zshcmd")
-
-    # Use the specified model or default
-    model_name = model or "anthropic/claude-3-sonnet-20240229"
+    model_name = model or DEFAULT_MODEL
 
     # Execute the command and get the output
-    import subprocess
-
-    result = subprocess.run(
-        " ".join(command), shell=True, capture_output=True, text=True
-    )
+    result = asyncio.run(_run_command_with_warmup(command, ["zshcmd"], model_name))
 
     if result.returncode != 0:
-        console.print(f"[bold red]Command error:[/bold red] {result.stderr}")
+        get_console().print(f"[bold red]Command error:[/bold red] {result.stderr}")
         sys.exit(result.returncode)
 
-    # Run the prompt with the command output using llm
-    try:
-        llm_model = llm.get_model(model_name)
-        response = llm_model.prompt(result.stdout, system=system_prompt, temperature=0)
-        llm_result = response.text()
-
-        # Display the result
-        if ctx.obj and ctx.obj.get("md", True):
-            md = Markdown(llm_result, code_theme="monokai")
-            console.print(md)
-        else:
-            sys.stdout.write(llm_result)
-    except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
-        sys.exit(1)
+    _run_template(ctx, ["zshcmd"], result.stdout, model_name)
 
 
 @app.command()
@@ -130,23 +114,4 @@ def pyclaude(
     """
     Run a prompt using the pyclaude template.
     """
-    # Get the pyclaude template
-    template_content = template_mgr.get_template_content("pyclaude")
-
-    # Run the prompt using llm
-    try:
-        model = llm.get_model("anthropic/claude-3-sonnet-20240229")
-        response = model.prompt(
-            " ".join(prompt) if prompt else "", system=template_content, temperature=0
-        )
-        result = response.text()
-
-        # Display the result
-        if ctx.obj and ctx.obj.get("md", True):
-            md = Markdown(result, code_theme="monokai")
-            console.print(md)
-        else:
-            sys.stdout.write(result)
-    except Exception as e:
-        console.print(f"[bold red]Error:[/bold red] {str(e)}")
-        sys.exit(1)
+    _run_template(ctx, ["pyclaude"], " ".join(prompt) if prompt else "")
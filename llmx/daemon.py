@@ -0,0 +1,130 @@
+"""
+Background server that runs CLI invocations in a warm process.
+
+Each connection carries one JSON request, {"argv": [...], "stdin": "..."},
+terminated by the client closing its write side. The server runs the CLI
+in-process with that argv and stdin and streams the output back over the
+same connection, then ends it with a newline and an exit status line,
+"llmx-exit: N", before closing it. Imports, plugins and memoized models stay
+loaded between requests, so a call only pays for the socket round trip and the
+model.
+"""
+
+import io
+import json
+import os
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Dict
+
+from llmx.utils import get_console
+
+DEFAULT_SOCKET_PATH = Path.home() / ".cache" / "llmx" / "sock"
+
+# Prefix of the last line of every response; clients strip that line, and the
+# newline before it, and exit with its status
+EXIT_STATUS_PREFIX = "llmx-exit: "
+
+# Set while a request runs, so the request can't start a server of its own:
+# that would never return, and the outer server would hang on it
+_in_request = False
+
+
+def serve(socket_path: Path = DEFAULT_SOCKET_PATH):
+    """
+    Listen on a Unix socket and handle requests one at a time.
+    Requests are serialized because each one swaps the process-wide stdio.
+    """
+    if _in_request:
+        raise RuntimeError("the daemon can't be started from the daemon")
+
+    # The socket runs arbitrary CLI commands, so keep it private to the user.
+    # llmx's own cache directory is made private too; mkdir's mode only applies
+    # when it creates the directory, so it's set explicitly. A directory
+    # passed with --socket is left as it is.
+    socket_dir = socket_path.parent
+    socket_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if socket_dir == DEFAULT_SOCKET_PATH.parent:
+        os.chmod(socket_dir, 0o700)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(socket_path))
+        os.chmod(socket_path, 0o600)
+        server.listen()
+        get_console().print(f"Listening on {socket_path}")
+        try:
+            while True:
+                conn, _ = server.accept()
+                with conn:
+                    _handle(conn)
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def _handle(conn: socket.socket):
+    """
+    Run a single request and write its output back to the client.
+    """
+    out = conn.makefile("w", encoding="utf-8", errors="replace")
+    status = 1
+    try:
+        request = _read_request(conn)
+        status = _run(request, out)
+    except Exception as e:
+        out.write(f"Error: {e}\n")
+    finally:
+        try:
+            out.write(f"\n{EXIT_STATUS_PREFIX}{status}\n")
+            out.close()
+        except OSError:
+            pass
+
+
+def _read_request(conn: socket.socket) -> Dict[str, Any]:
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    request = json.loads(b"".join(chunks) or b"{}")
+    if not isinstance(request.get("argv", []), list):
+        raise ValueError("'argv' must be a list of strings")
+    return request
+
+
+def _run(request: Dict[str, Any], out: io.TextIOBase) -> int:
+    """
+    Invoke the CLI app with the request's argv and stdin, writing to `out`.
+    Returns the exit status the command would have had as its own process.
+    """
+    global _in_request
+    from llmx.cli import app
+
+    argv = [str(arg) for arg in request.get("argv", [])]
+    stdin = io.TextIOWrapper(
+        io.BytesIO(request.get("stdin", "").encode("utf-8")), encoding="utf-8"
+    )
+    original_stdin = sys.stdin
+    sys.stdin = stdin
+    _in_request = True
+    try:
+        with redirect_stdout(out), redirect_stderr(out):
+            app(args=argv, prog_name="llm")
+    except SystemExit as e:
+        return _exit_status(e.code, out)
+    finally:
+        _in_request = False
+        sys.stdin = original_stdin
+    return 0
+
+
+def _exit_status(code: Any, out: io.TextIOBase) -> int:
+    # Same mapping as the interpreter's for SystemExit(code)
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    out.write(f"{code}\n")
+    return 1
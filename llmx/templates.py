@@ -2,19 +2,43 @@
 Template management for the LLM CLI.
 """
 
+import atexit
+import hashlib
 import os
+import string
 import tempfile
-import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
-import yaml
-from rich.console import Console
+from llmx.utils import get_console
 
-import llm
-from llm.templates import Template
+# llm and yaml are imported in the functions that use them: importing this
+# module loads neither, and yaml is only loaded when a template must be parsed
 
-console = Console()
+# Template content read from user template files, keyed on (path, raw) and
+# invalidated by the file's mtime
+_CACHE: Dict[Tuple[Path, bool], Tuple[int, str]] = {}
+
+# Content of llm's system templates, keyed on (name, raw); these don't change
+# while the process runs
+_PROMPT_CACHE: Dict[Tuple[str, bool], str] = {}
+
+# Parsed prompts cached across processes, keyed by a hash of the template;
+# kept in llmx's own cache dir rather than llm's templates directory
+_PROMPT_CACHE_DIR = Path.home() / ".cache" / "llmx" / "templates"
+
+# Temporary template files, removed when the process exits
+_TEMP_FILES: Set[Path] = set()
+
+
+@atexit.register
+def _delete_temp_files():
+    for path in _TEMP_FILES:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
 
 
 class TemplateManager:
@@ -26,162 +50,171 @@ class TemplateManager:
         """
         Initialize the template manager.
         """
-        self.templates_path = self._get_templates_path()
-
-    def _get_templates_path(self) -> Path:
-        """
-        Get the path to the templates directory.
-        """
-        # Try to get the templates path using llm
-        try:
-            # The llm library uses llm.user_dir() to get the base user directory
-            base_dir = llm.user_dir()
-            templates_path = base_dir / "templates"
-            if not templates_path.exists():
-                templates_path.mkdir(parents=True, exist_ok=True)
-            return templates_path
-        except Exception as e:
-            console.print(
-                f"[yellow]Warning:[/yellow] Could not get templates path from llm: {e}"
-            )
-            # Fallback to standard location
-            user_home = Path.home()
-            if os.name == "posix":  # Linux/Mac
-                base_path = user_home / (
-                    "Library/Application Support/io.datasette.llm"
-                    if os.uname().sysname == "Darwin"
-                    else ".local/share/io.datasette.llm"
-                )
-            else:  # Windows
-                base_path = user_home / "AppData/Local/io.datasette.llm"
-
-            templates_path = base_path / "templates"
-            templates_path.mkdir(parents=True, exist_ok=True)
-            return templates_path
+        self.templates_path = _get_templates_path()
 
     def list_templates(self) -> List[str]:
         """
         List available templates.
         """
         # Get system templates using llm API
-        system_templates = llm.get_templates()
+        system_templates = _system_templates()
 
-        # Get user templates
+        # Get user templates; a single scandir pass, without building Paths
         user_templates = []
-        if self.templates_path.exists():
-            user_templates = [f.stem for f in self.templates_path.glob("*.yaml")]
+        if os.path.isdir(self.templates_path):
+            with os.scandir(self.templates_path) as entries:
+                user_templates = [
+                    entry.name[: -len(".yaml")]
+                    for entry in entries
+                    if entry.name.endswith(".yaml") and entry.is_file()
+                ]
 
         # Combine and deduplicate
-        all_templates = list(set(system_templates + user_templates))
+        all_templates = system_templates.union(user_templates)
         return sorted(all_templates)
 
-    def get_template_path(self, template_name: str) -> Optional[Path]:
+    def get_template_source(
+        self, template_name: str
+    ) -> Tuple[Optional[Path], Optional[str]]:
         """
-        Get the path to a template file.
-        Returns None if not found.
+        Find a template without copying it anywhere.
+        Returns the path of a user template file, or else the content of an llm
+        system template, as (path, None) or (None, content); (None, None) if
+        not found.
         """
         # Check user templates first
         template_path = self.templates_path / f"{template_name}.yaml"
         if template_path.exists():
-            return template_path
+            return template_path, None
 
         # If not found, try to get it from llm system templates
         try:
+            import llm
+
             template_content = llm.get_template(template_name)
             if template_content:
-                # Create a temporary file for the template
-                fd, temp_path = tempfile.mkstemp(suffix=".yaml")
-                os.close(fd)
-                temp_path = Path(temp_path)
-                temp_path.write_text(template_content)
-                self._schedule_deletion(temp_path)
-                return temp_path
+                return None, template_content
         except Exception:
             pass
 
-        return None
+        return None, None
+
+    def get_template_path(self, template_name: str) -> Optional[Path]:
+        """
+        Get the path to a template file.
+        System templates are written to a temporary file.
+        Returns None if not found.
+        """
+        template_path, template_content = self.get_template_source(template_name)
+        if template_path or not template_content:
+            return template_path
+
+        # Create a temporary file for the template
+        fd, temp_path = tempfile.mkstemp(suffix=".yaml")
+        os.close(fd)
+        temp_path = Path(temp_path)
+        temp_path.write_text(template_content)
+        self._schedule_deletion(temp_path)
+        return temp_path
 
     def get_template_content(self, template_name: str, raw: bool = False) -> str:
         """
         Get the content of a template by name.
         If raw is True, returns the raw YAML content, otherwise returns the prompt.
         """
-        # Use llm.get_template which handles both system and user templates
+        # Check user templates first, reusing the parsed result while the file
+        # is unchanged
+        template_path = self.templates_path / f"{template_name}.yaml"
         try:
-            content = llm.get_template(template_name)
-            if content:
-                if raw:
-                    return content
-
-                # Parse the YAML and extract the prompt
-                try:
-                    template_data = yaml.safe_load(content)
-                    if template_data and "prompt" in template_data:
-                        return template_data["prompt"]
-                    else:
-                        # If no prompt field, return the entire content
-                        return content
-                except yaml.YAMLError:
-                    # If not valid YAML, return as is
-                    return content
-        except Exception:
-            pass
+            mtime_ns = template_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if mtime_ns is not None:
+            cached = _CACHE.get((template_path, raw))
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+
+            # Bytes go straight to the YAML parser; only raw content is decoded
+            content = template_path.read_bytes()
+            result = content.decode("utf-8") if raw else self._parse_prompt(content)
+            _CACHE[(template_path, raw)] = (mtime_ns, result)
+            return result
+
+        # Fall back to llm.get_template for system templates
+        cached = _PROMPT_CACHE.get((template_name, raw))
+        if cached is not None:
+            return cached
+        _, content = self.get_template_source(template_name)
+        if content:
+            result = content if raw else self._parse_prompt(content)
+            _PROMPT_CACHE[(template_name, raw)] = result
+            return result
 
         # If template not found
         raise ValueError(f"Template '{template_name}' not found")
 
-    def merge_templates(self, template1: str, template2: str) -> str:
+    def _parse_prompt(self, content: Union[str, bytes]) -> str:
         """
-        Merge two templates by combining their prompts.
+        Extract the prompt from template YAML.
+        Parsed prompts are also cached on disk by content hash, so a new process
+        doesn't re-parse a template that hasn't changed.
         """
-        content1 = self.get_template_content(template1)
-        content2 = self.get_template_content(template2)
-        return f"{content1}\n\n{content2}"
+        data = content if isinstance(content, bytes) else content.encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()
+        cache_path = _PROMPT_CACHE_DIR / f"{digest}.txt"
+        try:
+            return cache_path.read_text(encoding="utf-8")
+        except (OSError, UnicodeError):
+            pass
 
-    def _schedule_deletion(self, file_path: Path):
+        prompt = _extract_prompt(content)
+        # Only string prompts can round-trip through the text cache
+        if isinstance(prompt, str):
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache_path.write_text(prompt, encoding="utf-8")
+            except (OSError, UnicodeError):
+                pass
+        return prompt
+
+    def merge_templates(self, *template_names: str) -> str:
         """
-        Schedule a file for deletion after a delay.
-        Helps with temporary files for system templates.
+        Merge templates by combining their prompts, in the order given.
         """
-        delay = 60  # 1 minute
+        if len(template_names) < 2:
+            return "\n\n".join(map(self.get_template_content, template_names))
 
-        def delete_file():
-            try:
-                time.sleep(delay)
-                if file_path.exists():
-                    file_path.unlink()
-            except Exception:
-                pass
+        # Reads and parses are independent, so overlap them on a cold cache
+        from concurrent.futures import ThreadPoolExecutor
 
-        # Start thread to delete file after delay
-        import threading
+        with ThreadPoolExecutor(max_workers=len(template_names)) as executor:
+            return "\n\n".join(executor.map(self.get_template_content, template_names))
 
-        threading.Thread(target=delete_file, daemon=True).start()
+    def _schedule_deletion(self, file_path: Path):
+        """
+        Schedule a file for deletion when the process exits.
+        Helps with temporary files for system templates.
+        """
+        _TEMP_FILES.add(file_path)
 
     def interpolate_template_variables(
         self, template_content: str, variables: Dict[str, Any] = None
     ) -> str:
         """
-        Interpolate variables in a template using llm.templates.Template.
+        Interpolate $variables in a template in a single pass.
+        Placeholders without a matching variable are left as they are.
         """
         if not variables:
             return template_content
 
-        # Create a Template instance
-        template = Template(
-            name="temp",  # Temporary name
-            prompt=template_content,  # Use the content as prompt
-        )
-
         try:
-            # Use Template.interpolate to handle variable substitution
-            interpolated_prompt, _ = template.evaluate("", variables)
-            return interpolated_prompt or template_content
-        except Template.MissingVariables:
-            # If variables are missing, return the original content
-            return template_content
+            # $input is the prompt's slot, which is empty here
+            return string.Template(template_content).safe_substitute(
+                variables, input=""
+            )
         except Exception as e:
-            console.print(
+            get_console().print(
                 f"[yellow]Warning:[/yellow] Error interpolating variables: {e}"
             )
             return template_content
@@ -209,3 +242,115 @@ class TemplateManager:
             template_path.write_text(yaml_content)
 
         return template_path
+
+
+@lru_cache(maxsize=1)
+def get_template_manager() -> TemplateManager:
+    """
+    Get the process-wide template manager.
+    """
+    return TemplateManager()
+
+
+def template_names() -> FrozenSet[str]:
+    """
+    Get the names of all available templates.
+    Cached per process and refreshed when the user templates directory changes.
+    """
+    templates_path = get_template_manager().templates_path
+    return _template_names(_mtime_ns(templates_path))
+
+
+def template_content(template_name: str) -> str:
+    """
+    Get the prompt of a template by name, using the process-wide manager.
+    """
+    return get_template_manager().get_template_content(template_name)
+
+
+@lru_cache(maxsize=8)
+def _template_names(dir_mtime_ns: Optional[int]) -> FrozenSet[str]:
+    return frozenset(get_template_manager().list_templates())
+
+
+def _extract_prompt(content: Union[str, bytes]) -> str:
+    """
+    Get the prompt field of template YAML, or the content itself if it has none.
+    """
+    import yaml
+
+    try:
+        template_data = yaml.load(content, Loader=_safe_loader())
+    except yaml.YAMLError:
+        # If not valid YAML, return as is
+        template_data = None
+    if isinstance(template_data, dict) and "prompt" in template_data:
+        return template_data["prompt"]
+    # If no prompt field, return the entire content
+    return content.decode("utf-8") if isinstance(content, bytes) else content
+
+
+@lru_cache(maxsize=1)
+def _system_templates() -> FrozenSet[str]:
+    """
+    Get the names of llm's system templates, or none if llm can't list them.
+    Cached per process, since they don't change while it runs.
+    """
+    try:
+        import llm
+
+        return frozenset(llm.get_templates())
+    except Exception:
+        # Not every llm release has get_templates (0.22 doesn't)
+        return frozenset()
+
+
+@lru_cache(maxsize=1)
+def _get_templates_path() -> Path:
+    """
+    Get the path to the templates directory.
+    Resolved once per process; the directory is only created when a template
+    is written to it.
+    """
+    # Try to get the templates path using llm
+    try:
+        import llm
+
+        # The llm library uses llm.user_dir() to get the base user directory
+        return llm.user_dir() / "templates"
+    except Exception as e:
+        get_console().print(
+            f"[yellow]Warning:[/yellow] Could not get templates path from llm: {e}"
+        )
+        # Fallback to standard location
+        user_home = Path.home()
+        if os.name == "posix":  # Linux/Mac
+            base_path = user_home / (
+                "Library/Application Support/io.datasette.llm"
+                if os.uname().sysname == "Darwin"
+                else ".local/share/io.datasette.llm"
+            )
+        else:  # Windows
+            base_path = user_home / "AppData/Local/io.datasette.llm"
+
+        return base_path / "templates"
+
+
+@lru_cache(maxsize=1)
+def _safe_loader() -> type:
+    try:
+        # libyaml-backed loader; same results as SafeLoader, much faster
+        from yaml import CSafeLoader
+
+        return CSafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+
+        return SafeLoader
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
@@ -3,8 +3,221 @@ Utility functions for the LLM CLI.
 """
 
 import os
+import subprocess
 import sys
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from llm import AsyncModel, Model
+    from pygments.lexer import Lexer
+    from rich.console import Console
+    from rich.markdown import Markdown
+
+
+# Responses longer than this many characters are written as plain text, since
+# rendering them as markdown gets slow; overridden by LLMX_MD_MAX
+DEFAULT_MD_MAX = 8192
+
+
+@lru_cache(maxsize=1)
+def get_console() -> "Console":
+    """
+    Get the shared Rich console, importing Rich on first use.
+
+    Returns:
+        The process-wide Console instance
+    """
+    from rich.console import Console
+
+    # Markup is kept for the error messages; auto-highlighting of plain strings
+    # is only an extra regex pass over everything we print
+    return Console(highlight=False)
+
+
+@lru_cache(maxsize=8)
+def _get_lexer(name: str) -> Optional["Lexer"]:
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    try:
+        # Same options rich.syntax.Syntax uses when resolving a lexer by name
+        return get_lexer_by_name(name, stripnl=False, ensurenl=True, tabsize=4)
+    except ClassNotFound:
+        return None
+
+
+def make_markdown(text: str, inline_code_lexer: str = "python") -> "Markdown":
+    """
+    Build a Markdown renderable with the CLI's code styling.
+
+    Args:
+        text: The markdown text
+        inline_code_lexer: Lexer for inline code blocks
+
+    Returns:
+        The Markdown renderable
+    """
+    from rich.markdown import Markdown
+
+    # Rich resolves a lexer name on every inline code span it highlights;
+    # handing it a resolved lexer instance skips that lookup
+    return Markdown(
+        text,
+        code_theme="monokai",
+        inline_code_lexer=_get_lexer(inline_code_lexer) or inline_code_lexer,
+    )
+
+
+@lru_cache(maxsize=8)
+def get_model(model_name: str) -> "Model":
+    """
+    Get an llm model by name, memoized for the lifetime of the process.
+
+    Args:
+        model_name: The model ID or alias
+
+    Returns:
+        The resolved model
+    """
+    import llm
+
+    from llmx.clients import install_client_reuse
+
+    install_client_reuse()
+    return llm.get_model(model_name)
+
+
+@lru_cache(maxsize=8)
+def get_async_model(model_name: str) -> "AsyncModel":
+    """
+    Get an async llm model by name, memoized for the lifetime of the process.
+
+    Args:
+        model_name: The model ID or alias
+
+    Returns:
+        The resolved async model
+    """
+    import llm
+
+    from llmx.clients import install_client_reuse
+
+    install_client_reuse()
+    return llm.get_async_model(model_name)
+
+
+def render_response(
+    response: Iterable[str], md: bool = True, inline_code_lexer: str = "python"
+) -> str:
+    """
+    Display a response progressively as its chunks arrive.
+
+    Args:
+        response: An llm Response, or any iterable of text chunks
+        md: Whether to render the text as markdown
+        inline_code_lexer: Lexer for inline code blocks
+
+    Returns:
+        The full response text
+    """
+    chunks = []
+    chunk_iter = iter(response)
+
+    if not md:
+        _write_plain(chunk_iter, chunks)
+        return "".join(chunks)
+
+    console = get_console()
+    md_max = _md_max()
+
+    # Live only redraws on a terminal; anywhere else, render the final text once
+    if not console.is_terminal:
+        chunks.extend(chunk_iter)
+        text = "".join(chunks)
+        if len(text) > md_max:
+            _note_md_skipped(md_max)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        else:
+            console.print(make_markdown(text, inline_code_lexer))
+        return text
+
+    from rich.live import Live
+
+    # Only the trailing, still-growing block is re-parsed on each chunk; blocks
+    # that can no longer change are printed once, above the live region
+    pending = ""
+    length = 0
+    with Live(
+        console=console, refresh_per_second=10, vertical_overflow="visible"
+    ) as live:
+        for chunk in chunk_iter:
+            chunks.append(chunk)
+            pending += chunk
+            length += len(chunk)
+            if length > md_max:
+                # The rest, including the unfinished block, is written as is
+                live.update("")
+                break
+            stable_end = _stable_block_end(pending)
+            if stable_end:
+                stable = make_markdown(pending[:stable_end], inline_code_lexer)
+                live.console.print(stable)
+                live.console.print()
+                pending = pending[stable_end:]
+            live.update(make_markdown(pending, inline_code_lexer))
+
+    if length > md_max:
+        _note_md_skipped(md_max)
+        sys.stdout.write(pending)
+        _write_plain(chunk_iter, chunks)
+    return "".join(chunks)
+
+
+def _write_plain(chunk_iter: Iterator[str], chunks: List[str]):
+    for chunk in chunk_iter:
+        chunks.append(chunk)
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+
+
+def _md_max() -> int:
+    try:
+        return int(os.environ.get("LLMX_MD_MAX", DEFAULT_MD_MAX))
+    except ValueError:
+        return DEFAULT_MD_MAX
+
+
+def _note_md_skipped(md_max: int):
+    from rich.console import Console
+
+    Console(stderr=True, highlight=False).print(
+        f"[dim]markdown rendering skipped (response > {md_max} characters)[/dim]"
+    )
+
+
+def _stable_block_end(text: str) -> int:
+    """
+    Find where the completed markdown blocks at the start of a text end.
+
+    Args:
+        text: Markdown text that starts outside a code fence
+
+    Returns:
+        The offset just past the last blank line outside a code fence, or 0
+    """
+    end = 0
+    offset = 0
+    in_fence = False
+    for line in text.splitlines(keepends=True):
+        offset += len(line)
+        stripped = line.strip()
+        if stripped.startswith(("```", "~~~")):
+            in_fence = not in_fence
+        elif not stripped and not in_fence and line.endswith("\n"):
+            end = offset
+    return end
 
 
 def get_piped_content() -> Optional[str]:
@@ -14,13 +227,48 @@ def get_piped_content() -> Optional[str]:
     Returns:
         The piped content or None if no content is piped
     """
-    if not os.isatty(sys.stdin.fileno()):
-        content = sys.stdin.read().strip()
-        if content:
-            return content
+    if not sys.stdin.isatty():
+        # Decode the raw bytes in one go, skipping text mode's newline handling
+        content = sys.stdin.buffer.read().decode("utf-8", "replace").strip()
+        return content or None
     return None
 
 
+def run_command(command: List[str]) -> subprocess.CompletedProcess:
+    """
+    Run a shell command and capture its output.
+
+    The child gets /dev/null as stdin, so it neither inherits nor consumes
+    content piped to the CLI.
+
+    Args:
+        command: The command and its arguments, joined with spaces
+
+    Returns:
+        The completed process, with text stdout and stderr
+    """
+    return subprocess.run(
+        " ".join(command),
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+
+
+def iter_piped_content() -> Iterator[str]:
+    """
+    Iterate over content being piped to the command, line by line as it arrives.
+
+    Yields:
+        Lines of piped content, including their line endings; nothing if no
+        content is piped
+    """
+    if sys.stdin.isatty():
+        return
+    yield from sys.stdin
+
+
 def format_piped_content(content: str, stdin_tag: Optional[str] = None) -> str:
     """
     Format piped content for better prompt engineering.
@@ -73,7 +321,8 @@ def shorten_string(s: str, max_length: int = 310) -> str:
     prefix = s[:prefix_length]
     suffix = s[-suffix_length:]
 
-    if "\n" in s or "\n" in suffix:
+    # Pick the separator from the kept ends rather than scanning all of s
+    if "\n" in prefix or "\n" in suffix:
         return f"{prefix}\n...\n{suffix}"
     else:
         return f"{prefix} ... {suffix}"
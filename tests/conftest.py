@@ -0,0 +1,77 @@
+"""
+Shared pytest configuration.
+
+Live tests run in one of three ways:
+- by default, replay the test's cassette from tests/cassettes/ if there is one,
+  and are skipped otherwise;
+- with --run-live, call the real API, without cassettes;
+- with --run-live --record-mode=once (or rewrite), call the real API and record
+  the traffic to cassettes, which later runs replay.
+"""
+
+from pathlib import Path
+
+import pytest
+from pytest_recording.plugin import get_default_cassette_name
+
+# Per-test timeouts, in seconds, applied when pytest-timeout is installed. e2e
+# tests get none: their session setup may sync a venv, and each subprocess has
+# its own timeout.
+FAST_TIMEOUT = 5
+LIVE_TIMEOUT = 30
+
+# Opt-in test groups: marker name -> (command-line flag, help)
+OPT_IN_MARKERS = {
+    "uv": ("--run-uv", "Run the tests that go through 'uv run' on every call"),
+    "live": ("--run-live", "Run the tests that call a real LLM API"),
+}
+
+
+def pytest_addoption(parser):
+    for flag, help_text in OPT_IN_MARKERS.values():
+        parser.addoption(flag, action="store_true", default=False, help=help_text)
+
+
+def pytest_collection_modifyitems(config, items):
+    set_timeouts = config.pluginmanager.hasplugin("timeout")
+    for item in items:
+        if "live" in item.keywords:
+            # Live tests replay their recorded HTTP traffic when it's available
+            item.add_marker(pytest.mark.vcr)
+        if set_timeouts and "e2e" not in item.keywords:
+            timeout = LIVE_TIMEOUT if "live" in item.keywords else FAST_TIMEOUT
+            item.add_marker(pytest.mark.timeout(timeout))
+
+    for marker, (flag, _) in OPT_IN_MARKERS.items():
+        if config.getoption(flag):
+            continue
+        skip = pytest.mark.skip(reason=f"needs {flag}")
+        for item in items:
+            if marker in item.keywords and not _has_cassette(item):
+                item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def disable_recording(request):
+    """
+    With --run-live, hit the real API instead of replaying cassettes, unless a
+    --record-mode asks for the traffic to be recorded.
+    """
+    config = request.config
+    if config.getoption("--disable-recording"):
+        return True
+    return config.getoption("--run-live") and not config.getoption("--record-mode")
+
+
+@pytest.fixture(scope="module")
+def vcr_config():
+    """Keep API keys out of recorded cassettes."""
+    return {"filter_headers": ["authorization", "x-api-key"]}
+
+
+def _has_cassette(item) -> bool:
+    if "vcr" not in item.keywords:
+        return False
+    name = get_default_cassette_name(getattr(item, "cls", None), item.name)
+    cassette_dir = Path(item.path).parent / "cassettes" / Path(item.path).stem
+    return (cassette_dir / f"{name}.yaml").exists()
@@ -2,146 +2,341 @@
 Tests for the CLI entry point.
 """
 
-import subprocess
+import asyncio
+import gc
+import os
 import re
+import subprocess
+import tempfile
 from pathlib import Path
+
 import pytest
+from typer.testing import CliRunner
 
+from llmx.cli import app
 
-@pytest.fixture
+# The tests are safe to spread across xdist workers (pytest -n auto). This
+# group only matters under --dist=loadgroup, where it keeps the whole module on
+# one worker; other modes ignore it.
+pytestmark = pytest.mark.xdist_group("cli")
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LLM_BIN = str(ROOT_DIR / "bin" / "llm")
+
+# Seconds an e2e subprocess gets before it's killed; they only parse arguments
+SUBPROCESS_TIMEOUT = 5
+
+# Matched against the raw output bytes, so the check doesn't decode them
+ANSI_COLOR_RE = re.compile(rb"\x1b\[\d+(;\d+)*m")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_imports():
+    """
+    Import what llmx loads lazily once up front, so the in-process tests don't
+    time the first import of llm and its plugins.
+    """
+    import llm  # noqa: F401
+    import rich.live  # noqa: F401
+    import rich.markdown  # noqa: F401
+
+
+@pytest.fixture(scope="session")
 def root_dir():
     """Return the root directory of the project."""
-    return Path(__file__).parent.parent.absolute()
+    return ROOT_DIR
+
+
+@pytest.fixture(scope="session")
+def uv_env(root_dir):
+    """Sync the project venv once and return the environment for uv subprocesses."""
+    env = os.environ.copy()
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if worker:
+        # Give each xdist worker its own venv so uv runs don't contend on a lock
+        env["UV_PROJECT_ENVIRONMENT"] = os.path.join(
+            tempfile.gettempdir(), f"uv-env-{worker}"
+        )
 
+    subprocess.run(
+        ["uv", "sync", "--locked"],
+        cwd=root_dir,
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    # Later uv runs in the session skip the lockfile and venv checks
+    env["UV_NO_SYNC"] = "1"
+    return env
+
+
+@pytest.fixture(scope="session")
+def python_exe(root_dir, uv_env):
+    """Return the project venv's Python interpreter."""
+    result = subprocess.run(
+        ["uv", "run", "python", "-c", "import sys; print(sys.executable)"],
+        cwd=root_dir,
+        env=uv_env,
+        capture_output=True,
+        encoding="utf-8",
+        errors="replace",
+        check=True,
+    )
+    return result.stdout.strip()
 
-@pytest.fixture
-def run_uv_command():
-    """Run a uv command and return the result."""
 
-    def _run_command(args, **kwargs):
-        return subprocess.run(
-            ["uv", "run"] + args, capture_output=True, text=True, **kwargs
+# Runs of bin/llm needed by the e2e tests, keyed by id. They are all started
+# together by the bin_llm_results fixture.
+BIN_LLM_RUNS = {
+    "help": ["--help"],
+    "invalid_argument": ["--invalid-argument"],
+}
+
+
+@pytest.fixture(scope="session")
+def bin_llm_results(python_exe):
+    """Run every entry of BIN_LLM_RUNS concurrently and return the results by id."""
+
+    async def run(args):
+        # The venv's interpreter directly, skipping uv's per-run resolution
+        cmd = [python_exe, LLM_BIN, *args]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
         )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), SUBPROCESS_TIMEOUT
+            )
+        except TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        # Output is kept as bytes; the assertions don't need it decoded
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
 
-    return _run_command
+    async def run_all():
+        # Create every task before awaiting any of them
+        tasks = [asyncio.create_task(run(args)) for args in BIN_LLM_RUNS.values()]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    return dict(zip(BIN_LLM_RUNS, asyncio.run(run_all())))
 
 
 @pytest.fixture
-def run_llm_command(root_dir, run_uv_command):
-    """Run the llm command with the given arguments."""
+def bin_llm_result(bin_llm_results):
+    """Return the result of a BIN_LLM_RUNS entry, raising if it failed to run."""
+
+    def _bin_llm_result(run_id):
+        result = bin_llm_results[run_id]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return _bin_llm_result
 
-    def _run_llm_command(args=None, input_text=None, **kwargs):
-        cmd = [str(root_dir / "bin" / "llm")]
-        if args:
-            if isinstance(args, str):
-                cmd.append(args)
-            else:
-                cmd.extend(args)
 
-        kwargs.setdefault("timeout", 30)  # Default timeout to prevent hanging
+@pytest.fixture(scope="session")
+def run_llm_command():
+    """Run the llm command in-process with the given arguments."""
+    # Keep stderr apart, so the tests can tell errors from normal output
+    runner = CliRunner(mix_stderr=False)
 
-        if input_text is not None:
-            return run_uv_command(cmd, input=input_text, **kwargs)
-        else:
-            return run_uv_command(cmd, **kwargs)
+    def _run_llm_command(args=None, input_text=None):
+        if isinstance(args, str):
+            args = [args]
+        return runner.invoke(app, args or [], input=input_text)
 
     return _run_llm_command
 
 
-def test_llm_smoke_test(run_llm_command):
-    """Verify that running 'uv run bin/llm' with no arguments works correctly."""
-    result = run_llm_command()
+class FakeAsyncModel:
+    """
+    Stands in for an llm AsyncModel: each prompt's response is "<prompt>",
+    after the delay given for that prompt. Prompts listed in `failing` raise
+    instead, and prompts whose request was cancelled are recorded.
+    """
+
+    def __init__(self, delays, failing=()):
+        self.delays = delays
+        self.failing = set(failing)
+        self.cancelled = []
+
+    def prompt(self, prompt, **kwargs):
+        model = self
+
+        class Response:
+            async def text(self):
+                try:
+                    await asyncio.sleep(model.delays.get(prompt, 0))
+                except asyncio.CancelledError:
+                    model.cancelled.append(prompt)
+                    raise
+                if prompt in model.failing:
+                    raise RuntimeError(f"{prompt} failed")
+                return f"<{prompt}>"
+
+        return Response()
+
+
+@pytest.fixture
+def fake_async_model(monkeypatch):
+    """Install the FakeAsyncModel returned by the fixture for --parallel runs."""
+
+    def _fake_async_model(delays, failing=()):
+        model = FakeAsyncModel(delays, failing)
+        monkeypatch.setattr("llmx.cli.get_async_model", lambda name: model)
+        return model
+
+    return _fake_async_model
+
+
+@pytest.mark.e2e
+@pytest.mark.uv
+def test_llm_uv_run(uv_env):
+    """Verify that 'uv run bin/llm' still works through uv's wrapper."""
+    result = subprocess.run(
+        ["uv", "run", LLM_BIN, "--help"],
+        env=uv_env,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        timeout=SUBPROCESS_TIMEOUT,
+    )
 
     assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert b"Usage:" in result.stdout
 
 
-def test_llm_with_help_argument(run_llm_command):
-    """Verify that --help returns appropriate help text."""
-    result = run_llm_command("--help")
+@pytest.mark.e2e
+def test_llm_entry_point(bin_llm_result):
+    """Verify that bin/llm starts the CLI end to end."""
+    result = bin_llm_result("help")
 
     assert result.returncode == 0
-    assert result.stdout.strip() != ""
-    assert "Usage:" in result.stdout
-    assert "Options" in result.stdout
-    assert "Commands" in result.stdout
+    assert b"Usage:" in result.stdout
 
 
-def test_llm_with_invalid_argument(run_llm_command):
-    """Verify that invalid arguments are properly rejected."""
-    result = run_llm_command("--invalid-argument")
+@pytest.mark.e2e
+def test_llm_entry_point_invalid_argument(bin_llm_result):
+    """Verify that bin/llm exits with an error on invalid arguments."""
+    result = bin_llm_result("invalid_argument")
 
     assert result.returncode != 0
-    assert result.stderr.strip() != ""
+    assert b"Error" in result.stderr
+
+
+@pytest.mark.live
+def test_llm_smoke_test(run_llm_command):
+    """Verify that running llm with no arguments works correctly."""
+    result = run_llm_command()
+
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
+
+
+def test_llm_basic_argv_matrix(run_llm_command):
+    """Verify --help output and the rejection of invalid arguments."""
+    # --help returns appropriate help text
+    result = run_llm_command("--help")
+
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
+    assert "Usage:" in result.output
+    assert "Options" in result.output
+    assert "Commands" in result.output
+
+    # Invalid arguments are properly rejected
+    result = run_llm_command("--invalid-argument")
+
+    assert result.exit_code != 0
+    assert b"Error" in result.stderr_bytes
 
 
+def test_llm_cmd_helpers(run_llm_command):
+    """Verify that 'llm cmd' is the helper command group."""
+    result = run_llm_command(["cmd", "--help"])
+
+    assert result.exit_code == 0
+    assert "simplify" in result.output
+    assert "zshcmd" in result.output
+
+
+@pytest.mark.live
 def test_llm_prompt_command(run_llm_command):
     """Test the basic prompt command functionality."""
     result = run_llm_command(["prompt", "hi"])
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
 
-def test_llm_with_temperature_option(run_llm_command):
-    """Test the temperature option with -o flag."""
-    result = run_llm_command(["-o", "0.3", "prompt", "hi"])
+OPTION_CASES = pytest.mark.parametrize(
+    "options",
+    [["-o", "0.3"], ["-t", "claude"], ["-m", "gpt-3.5-turbo"]],
+    ids=["temperature", "template", "model"],
+)
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
 
+@OPTION_CASES
+def test_llm_option_parsing(run_llm_command, options):
+    """Test that the options parse, without calling the model."""
+    result = run_llm_command([*options, "prompt", "--help"])
 
-def test_llm_with_template_option(run_llm_command):
-    """Test the template option with -t flag."""
-    result = run_llm_command(["-t", "claude", "prompt", "hi"])
-
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert "Usage:" in result.output
 
 
-def test_llm_with_model_option(run_llm_command):
-    """Test specifying a model."""
-    result = run_llm_command(["-m", "gpt-3.5-turbo", "prompt", "hi"])
+@pytest.mark.live
+@OPTION_CASES
+def test_llm_with_option(run_llm_command, options):
+    """Test the temperature (-o), template (-t) and model (-m) options."""
+    result = run_llm_command([*options, "prompt", "hi"])
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
 
-@pytest.mark.skip(reason="Module 'llm' has no attribute 'get_templates'")
+@pytest.mark.live
 def test_llm_with_system_prompt(run_llm_command):
     """Test using a system prompt."""
     result = run_llm_command(["-s", "answer shortly", "prompt", "hi"])
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
 
+@pytest.mark.live
 def test_llm_with_stdin_input(run_llm_command):
     """Test passing input through stdin."""
     result = run_llm_command(input_text="What is Python?")
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
 
+@pytest.mark.live
 def test_llm_with_stdin_and_positional(run_llm_command):
     """Test passing input through stdin with positional argument."""
     result = run_llm_command(["prompt", "hi"], input_text="What is Python?")
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
 
+@pytest.mark.live
 def test_llm_with_no_format_stdin(run_llm_command):
     """Test with --no-format-stdin option."""
     result = run_llm_command(
         ["--no-format-stdin", "prompt"], input_text="What is Python?"
     )
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
 
+@pytest.mark.live
 @pytest.mark.skip(reason="No color codes in output, might be terminal-dependent")
 def test_llm_with_md_option(run_llm_command):
     """Test with --md option to check for color codes in output."""
@@ -149,13 +344,13 @@ def test_llm_with_md_option(run_llm_command):
         ["prompt", "Write a very short Python function that prints 'Hello, World!'"]
     )
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
 
-    ansi_color_pattern = re.compile(r"\x1b\[\d+(;\d+)*m")
-    assert ansi_color_pattern.search(result.stdout) is not None
+    assert ANSI_COLOR_RE.search(result.stdout_bytes) is not None
 
 
+@pytest.mark.live
 def test_llm_with_no_md_option(run_llm_command):
     """Test with --no-md option to check for absence of color codes."""
     result = run_llm_command(
@@ -166,8 +361,40 @@ def test_llm_with_no_md_option(run_llm_command):
         ]
     )
 
-    assert result.returncode == 0
-    assert result.stdout.strip() != ""
+    assert result.exit_code == 0
+    assert result.output.strip() != ""
+
+    assert ANSI_COLOR_RE.search(result.stdout_bytes) is None
+
+
+def test_llm_parallel_prompts_in_input_order(run_llm_command, fake_async_model):
+    """Test that --parallel prints responses in input order, not finish order."""
+    fake_async_model({"a": 0.03, "b": 0.02, "c": 0.01})
+
+    result = run_llm_command(
+        ["--no-md", "--no-format-stdin", "prompt", "-P", "3"], input_text="a\nb\nc\n"
+    )
+
+    assert result.exit_code == 0
+    assert result.stdout == "<a>\n<b>\n<c>\n"
+
+
+def test_llm_parallel_prompt_error(run_llm_command, fake_async_model, caplog):
+    """Test that a failed --parallel prompt cancels and awaits the other ones."""
+    model = fake_async_model({"a": 0.02, "slow": 5}, failing={"boom", "later_boom"})
+
+    result = run_llm_command(
+        ["--no-md", "--no-format-stdin", "prompt", "-P", "4"],
+        input_text="a\nboom\nlater_boom\nslow\n",
+    )
+
+    assert result.exit_code == 1
+    assert result.stdout.startswith("<a>\n")
+    assert "boom failed" in result.stdout
+    assert model.cancelled == ["slow"]
 
-    ansi_color_pattern = re.compile(r"\x1b\[\d+(;\d+)*m")
-    assert ansi_color_pattern.search(result.stdout) is None
+    # The traceback kept on the result references the tasks; once they're
+    # collected, any exception nobody retrieved would be logged
+    del result
+    gc.collect()
+    assert "never retrieved" not in caplog.text
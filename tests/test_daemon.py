@@ -0,0 +1,63 @@
+"""
+Tests for the daemon's request protocol.
+"""
+
+import json
+import socket
+
+import pytest
+
+from llmx.daemon import EXIT_STATUS_PREFIX, _handle
+
+
+@pytest.fixture
+def daemon_request():
+    """Send a request to the daemon's handler and return the raw response."""
+
+    def _daemon_request(request):
+        server, client = socket.socketpair()
+        with client:
+            client.sendall(json.dumps(request).encode("utf-8"))
+            client.shutdown(socket.SHUT_WR)
+            # serve() closes each connection once it's handled
+            with server:
+                _handle(server)
+            return client.makefile("r", encoding="utf-8").read()
+
+    return _daemon_request
+
+
+def split_response(response):
+    """Split a response into its output and the exit status on its last line."""
+    output, _, status_line = response.rpartition(f"\n{EXIT_STATUS_PREFIX}")
+    assert status_line.endswith("\n")
+    return output, int(status_line)
+
+
+def test_daemon_round_trip(daemon_request):
+    """Verify that a request's output comes back before a zero exit status."""
+    output, status = split_response(daemon_request({"argv": ["--help"]}))
+
+    assert status == 0
+    assert "Usage: llm" in output
+
+
+def test_daemon_exit_status(daemon_request):
+    """Verify that the exit status of a failed command is passed back."""
+    output, status = split_response(daemon_request({"argv": ["--invalid-argument"]}))
+
+    assert status == 2
+    assert "Error" in output
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [["daemon"], ["--no-md", "daemon", "--socket", "/tmp/llmx-nested-sock"]],
+    ids=["direct", "after_options"],
+)
+def test_daemon_rejects_nested_daemon(daemon_request, argv):
+    """Verify that a request can't start a second server, however it's spelled."""
+    output, status = split_response(daemon_request({"argv": argv}))
+
+    assert status == 1
+    assert "can't be started from the daemon" in output